@@ -1,27 +1,85 @@
 import streamlit as st
+import hashlib
+import hmac
+import os
 import time
 import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import pandas as pd
 from google.cloud import storage
 from google.oauth2 import service_account
 
+# Minimum number of seconds between two background uploads of the database
+UPLOAD_MIN_INTERVAL = 30
+
+# Share one GCS bucket handle (and its client) per process instead of re-authenticating on every call
+@st.cache_resource
+def _gcs_bucket():
+    return storage.Client(credentials=credentials).bucket(GCS_BUCKET)
+
 # Helper functions to upload and download from GCS
-def upload_db_to_gcs(credentials, bucket_name, source_file_name, destination_blob_name):
+def upload_db_to_gcs(source_file_name, destination_blob_name, bucket=None):
     """Uploads a file to the bucket."""
-    storage_client = storage.Client(credentials=credentials)
-    bucket = storage_client.bucket(bucket_name)
+    if bucket is None:  # The background worker passes in the bucket it was given
+        bucket = _gcs_bucket()
     blob = bucket.blob(destination_blob_name)
     blob.upload_from_filename(source_file_name)
-    print(f"Uploaded {source_file_name} to {destination_blob_name} in {bucket_name}.")
+    print(f"Uploaded {source_file_name} to {destination_blob_name} in {GCS_BUCKET}.")
+    return blob
 
-def download_db_from_gcs(credentials, bucket_name, source_blob_name, destination_file_name):
+def download_db_from_gcs(source_blob_name, destination_file_name):
     """Downloads a blob from the bucket."""
-    storage_client = storage.Client(credentials=credentials)
-    bucket = storage_client.bucket(bucket_name)
-    blob = bucket.blob(source_blob_name)
+    blob = _gcs_bucket().blob(source_blob_name)
     blob.download_to_filename(destination_file_name)
-    print(f"Downloaded {source_blob_name} from {bucket_name} to {destination_file_name}.")
+    print(f"Downloaded {source_blob_name} from {GCS_BUCKET} to {destination_file_name}.")
+
+# Single background worker plus the bookkeeping needed to coalesce uploads
+@st.cache_resource
+def _upload_worker():
+    return {"executor": ThreadPoolExecutor(max_workers=1), "lock": threading.Lock(), "pending": False, "last_upload": 0.0}
+
+def _run_upload(worker, db_lock, bucket, delay=0.0):
+    # Wait out the debounce window so writes in quick succession share one upload
+    time.sleep(max(delay, worker["last_upload"] + UPLOAD_MIN_INTERVAL - time.time()))
+    with worker["lock"]:
+        worker["pending"] = False
+    snapshot_fd, snapshot_path = tempfile.mkstemp(suffix=".db")
+    os.close(snapshot_fd)
+    try:
+        # Snapshot under the lock, so no transaction, checkpoint or restore can change the file mid-copy;
+        # the backup API also picks up commits that are still in the WAL
+        with db_lock:
+            source, snapshot = sqlite3.connect(DB_NAME), sqlite3.connect(snapshot_path)
+            try:
+                source.backup(snapshot)
+            finally:
+                snapshot.close()
+                source.close()
+        blob = upload_db_to_gcs(snapshot_path, DB_BKP_NAME, bucket)
+        _write_marker(DB_GENERATION_MARKER, blob.generation)  # Our own upload is not a reason to download again
+        worker["last_upload"] = time.time()
+    except Exception as e:
+        # The backup is now behind the local file; try again later unless a newer upload is already queued
+        print(f"Background upload failed, retrying in {UPLOAD_MIN_INTERVAL}s: {e}")
+        with worker["lock"]:
+            if not worker["pending"]:
+                worker["pending"] = True
+                worker["executor"].submit(_run_upload, worker, db_lock, bucket, UPLOAD_MIN_INTERVAL)
+    finally:
+        os.remove(snapshot_path)
+
+# Queue an upload of the database without blocking the UI; no-op if one is already queued
+def schedule_db_upload():
+    worker = _upload_worker()
+    with worker["lock"]:
+        if worker["pending"]:
+            return
+        worker["pending"] = True
+    worker["executor"].submit(_run_upload, worker, _db_lock(), _gcs_bucket())
 
 # Create a credentials object using the service account info from the secrets
 credentials = service_account.Credentials.from_service_account_info(
@@ -31,87 +89,306 @@ credentials = service_account.Credentials.from_service_account_info(
 
 st.set_page_config(layout="wide")
 
-# Initialize the database and create a table if not present
+# Bookings are stored as integers: room_id (see rooms), date.toordinal() and minutes since midnight
+_SQL_ROOM_ID = "(SELECT room_id FROM rooms WHERE room_name=?)"
+
+# SQL used on the hot path; kept as constants so every call hits the connection's statement cache
+_SQL_IS_AVAILABLE = f"SELECT 1 FROM bookings WHERE room_id={_SQL_ROOM_ID} AND date_ord IN ({{placeholders}}) AND start_min < ? AND end_min > ? LIMIT 1"
+_SQL_DELETE = f"DELETE FROM bookings WHERE room_id={_SQL_ROOM_ID} AND date_ord=? AND start_min=?"
+_SQL_GET_DAY = "SELECT room_name, date_ord, start_min, end_min, booking_info FROM bookings JOIN rooms USING (room_id) WHERE date_ord=?"
+_SQL_ADD_ROOM = "INSERT OR IGNORE INTO rooms (room_name) VALUES (?)"
+_SQL_INSERT = f"INSERT INTO bookings (room_id, date_ord, start_min, end_min, booking_info) VALUES ({_SQL_ROOM_ID}, ?, ?, ?, ?)"
+
+# Convert between the 'YYYY-MM-DD' / 'HH:MM' strings used by the UI and the stored integers
+def to_date_ord(date):
+    return datetime.strptime(date[:10], "%Y-%m-%d").toordinal()
+
+def from_date_ord(date_ord):
+    return str(datetime.fromordinal(date_ord).date())
+
+def to_minutes(timeslot):
+    hours, minutes = timeslot.split(":")
+    return int(hours) * 60 + int(minutes)
+
+def from_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+# Open the database connection once per process and reuse it across reruns
+@st.cache_resource
+def get_conn():
+    conn = sqlite3.connect(DB_NAME, check_same_thread=False, isolation_level=None, cached_statements=128)
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA busy_timeout=5000;
+        PRAGMA cache_size=-20000;
+        PRAGMA temp_store=memory;
+        PRAGMA mmap_size=268435456;
+    """)
+    return conn
+
+# Close the cached connection and keep every other session off the database while the file is replaced;
+# the enclosed block should download the new file and run init_db() on it
+@contextmanager
+def close_conn():
+    with _db_lock():
+        get_conn().close()
+        get_conn.clear()
+        try:
+            yield
+        finally:
+            _load_day.clear()
+
+# All sessions share one connection, and a statement run while another session's transaction is open
+# becomes part of it (and sees its uncommitted rows). Every use of the connection therefore goes through
+# this lock; it is re-entrant so reads can run inside write_transaction().
+@st.cache_resource
+def _db_lock():
+    return threading.RLock()
+
+# Run the enclosed statements as one write transaction; BEGIN IMMEDIATE takes SQLite's write lock up front
+@contextmanager
+def write_transaction():
+    with _db_lock():
+        conn = get_conn()  # Fetched under the lock so a restore can't close it underneath us
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            _load_day.clear()
+            raise
+
+# Convert one TEXT-schema booking row for the integer schema; returns None for rows that can't be repaired.
+# Bookings starting at 19:00 were stored with end_time NULL (no end time was offered), so a missing or
+# non-positive duration falls back to a single 30 minute slot.
+def _migrate_text_booking(booking):
+    room, date, start_time, end_time, info = booking
+    try:
+        if not room:
+            raise ValueError("missing room")
+        date_ord, start_min = to_date_ord(date), to_minutes(start_time)
+    except (AttributeError, TypeError, ValueError):
+        print(f"Skipping malformed booking during migration: {booking}")
+        return None
+    try:
+        end_min = to_minutes(end_time)
+    except (AttributeError, TypeError, ValueError):
+        end_min = None
+    if end_min is None or end_min <= start_min:
+        end_min = start_min + 30
+    return (room, date_ord, start_min, end_min, info)
+
+# Initialize the database and create the tables if not present
 def init_db():
-    with sqlite3.connect("bookings.db") as conn:
+    with write_transaction() as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS rooms (room_id INTEGER PRIMARY KEY, room_name TEXT UNIQUE NOT NULL)")
+        columns = [column[1] for column in conn.execute("PRAGMA table_info(bookings)")]
+        if "date" in columns:
+            # Older databases (and backups) store everything as TEXT; move them over to the integer schema
+            conn.execute("ALTER TABLE bookings RENAME TO bookings_text")
         conn.execute("""
             CREATE TABLE IF NOT EXISTS bookings (
-                room_name TEXT,
-                date TEXT,
-                start_time TEXT,
-                end_time TEXT,
+                room_id INTEGER NOT NULL REFERENCES rooms (room_id),
+                date_ord INTEGER NOT NULL,
+                start_min INTEGER NOT NULL,
+                end_min INTEGER NOT NULL,
                 booking_info TEXT
             )
         """)
-
-# Check if a room is booked for a specific date and timeslot
-def is_room_booked(room, date, timeslot):
-    with sqlite3.connect("bookings.db") as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM bookings WHERE room_name=? AND date=? AND start_time <= ? AND end_time > ?", (room, date, timeslot, timeslot))
-        booking = cur.fetchone()
-    return booking
-
-# Check if a room is available for booking for a specific date and timeslot
-def is_room_available(room, date, start_time, end_time):
-    with sqlite3.connect("bookings.db") as conn:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT * FROM bookings WHERE room_name=? AND date=? AND 
-            ((start_time > ? AND start_time < ?) OR 
-             (end_time > ? AND end_time < ?) OR 
-             (start_time <= ? AND end_time > ?) OR
-             (start_time >= ? AND end_time <= ?))
-        """, (room, date, start_time, end_time, start_time, end_time, start_time, start_time, end_time, start_time))
-        booking = cur.fetchone()
-    return booking is None
+        if "date" in columns:
+            old_bookings = conn.execute("SELECT room_name, date, start_time, end_time, booking_info FROM bookings_text").fetchall()
+            migrated = [row for row in map(_migrate_text_booking, old_bookings) if row is not None]
+            conn.executemany(_SQL_ADD_ROOM, {(row[0],) for row in migrated})
+            conn.executemany(_SQL_INSERT, migrated)
+            conn.execute("DROP TABLE bookings_text")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_date_room_start ON bookings (date_ord, room_id, start_min)")
+
+# Check if a room is available for booking on all of the given dates for a timeslot
+def is_room_available(room, dates, start_time, end_time):
+    with _db_lock():
+        cur = get_conn().cursor()
+        # Two intervals overlap iff each one starts before the other ends
+        cur.execute(_SQL_IS_AVAILABLE.format(placeholders=", ".join("?" * len(dates))),
+                    (room, *[to_date_ord(date) for date in dates], to_minutes(end_time), to_minutes(start_time)))
+        return cur.fetchone() is None
+
+# Book a room for the same timeslot on all of the given dates in a single transaction.
+# The availability check runs inside the transaction, so two sessions can't both pass it and double-book;
+# returns False (and writes nothing) if the room is taken on any of the dates.
+def add_bookings(room, dates, start_time, end_time, booking_info):
+    with write_transaction() as conn:
+        if not is_room_available(room, dates, start_time, end_time):
+            return False
+        conn.execute(_SQL_ADD_ROOM, (room,))
+        conn.executemany(_SQL_INSERT, [(room, to_date_ord(date), to_minutes(start_time), to_minutes(end_time), booking_info)
+                                       for date in dates])
+    _load_day.clear()
+    return True
 
 # Delete a specific booking
 def delete_booking(room, date, start_time):
-    with sqlite3.connect("bookings.db") as conn:
-        conn.execute("DELETE FROM bookings WHERE room_name=? AND date=? AND start_time=?", (room, date, start_time))
-
-def get_all_bookings(date):
-    with sqlite3.connect("bookings.db") as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM bookings WHERE date=?", (date,))
-        bookings = cur.fetchall()
+    with write_transaction() as conn:
+        conn.execute(_SQL_DELETE, (room, to_date_ord(date), to_minutes(start_time)))
+    _load_day.clear()
+
+# Load all bookings for a date; cached across reruns and cleared on every write
+@st.cache_data(ttl=300)
+def _load_day(date):
+    with _db_lock():  # Don't read (and cache) another session's uncommitted rows
+        cur = get_conn().cursor()
+        cur.execute(_SQL_GET_DAY, (to_date_ord(date),))
+        rows = cur.fetchall()
+    bookings = [(room, from_date_ord(date_ord), from_minutes(start_min), from_minutes(end_min), info)
+                for room, date_ord, start_min, end_min, info in rows]
     return bookings
 
+# Index all bookings for a date by (room, timeslot); returns the index and the rows it was built from,
+# so the grid and the bookings table always come from the same query
+def get_day_index(date):
+    rows = _load_day(date)
+    idx = {}
+    for row in rows:
+        room, start_time, end_time = row[0], row[2], row[3]
+        for timeslot in TIMESLOTS:
+            if start_time <= timeslot < end_time:
+                idx.setdefault((room, timeslot), row)
+    return idx, rows
+
+
+# Small marker files next to the database that survive Streamlit reruns and new sessions
+def _read_marker(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+def _write_marker(path, value):
+    with open(path, "w") as f:
+        f.write(str(value))
 
 # Check if the database was restored today
 def restore_db_if_needed():
     today = datetime.now().date()
-    last_restored_date = st.session_state.get("last_restored_date", None)
-    
-    if last_restored_date != today:
-        download_db_from_gcs(credentials, GCS_BUCKET, DB_BKP_NAME, DB_NAME)
-        st.session_state.last_restored_date = today  # Update the session state with today's date
+    if _read_marker(DB_RESTORED_MARKER) == str(today):
+        return
+
+    # The local file came from our own restore/upload and was written today, so a download would only
+    # clobber newer bookings. Without the generation marker (e.g. a fresh checkout of the committed
+    # bookings.db) the mtime says nothing about where the file came from, so always check the backup.
+    today_start = datetime.combine(today, datetime.min.time()).timestamp()
+    if (_read_marker(DB_GENERATION_MARKER) is not None and os.path.exists(DB_NAME)
+            and os.path.getmtime(DB_NAME) >= today_start):
+        _write_marker(DB_RESTORED_MARKER, today)
+        return
+
+    # Only fetch the backup if it changed since the copy we already have
+    blob = _gcs_bucket().blob(DB_BKP_NAME)
+    blob.reload()
+    if not os.path.exists(DB_NAME) or _read_marker(DB_GENERATION_MARKER) != str(blob.generation):
+        with close_conn():
+            download_db_from_gcs(DB_BKP_NAME, DB_NAME)
+            init_db()  # Migrate and index the downloaded file before anyone else opens it
+        _write_marker(DB_GENERATION_MARKER, blob.generation)
+    _write_marker(DB_RESTORED_MARKER, today)
 
 
 GCS_BUCKET = "andreassens.appspot.com"
 DB_NAME = "bookings.db"
 DB_BKP_NAME = "bookings_prd.db"
+DB_RESTORED_MARKER = f"{DB_NAME}.restored_on"
+DB_GENERATION_MARKER = f"{DB_NAME}.meta"
+
+# Restore and initialize the database once per process instead of on every rerun
+@st.cache_resource
+def _init_once():
+    restore_db_if_needed()  # Call the function to potentially restore the database
+    init_db()  # Initialize the database (after restoring, so the restored file gets the index)
 
-init_db()  # Initialize the database
-restore_db_if_needed()  # Call the function to potentially restore the database
+_init_once()
 
 
 # Sample rooms
-rooms = ['Styrelsen', 'Visionären', 'Innovatören', 'Entreprenören', 'Amatören', 'Coffice']
+ROOMS = ('Styrelsen', 'Visionären', 'Innovatören', 'Entreprenören', 'Amatören', 'Coffice')
+
+# Generate time slots, every 30 minutes from 07:00 to 19:00
+TIMESLOTS = tuple(from_minutes(7 * 60 + 30 * i) for i in range(25))
+TIMESLOT_IDX = {timeslot: i for i, timeslot in enumerate(TIMESLOTS)}
+
+# Rooms vs time slots grid with no bookings, built once per process
+@st.cache_resource
+def _empty_grid():
+    return pd.DataFrame("", index=pd.Index(TIMESLOTS, name="Time Slot"), columns=ROOMS)
+
+# Delete button callback
+def on_delete_booking(room, date, start_time):
+    delete_booking(room, date, start_time)
+    schedule_db_upload()
+    st.toast("Booking Deleted!")
+
+# Render the grid and the day's bookings table; a fragment so its widgets only rerun this part
+@st.fragment
+def render_grid(date):
+    day_index, bookings_for_the_day = get_day_index(date)
+    # Start from the shared empty grid so only booked cells cost any work
+    grid_df = _empty_grid().copy()
+    for room, timeslot in day_index:
+        if room in grid_df.columns:
+            grid_df.at[timeslot, room] = "Booked"
+    st.dataframe(grid_df, use_container_width=True, height=35 * (len(TIMESLOTS) + 1) + 3)
+
+    # One selectbox for booking details instead of a button per booked cell
+    booked = st.selectbox("Booking Info", bookings_for_the_day, index=None, placeholder="Select a booking",
+                          format_func=lambda booking: f"{booking[0]} {booking[2]}-{booking[3]}")
+    if booked:
+        st.write(f"Booking Info for {booked[0]} on {date}")
+        st.text(f"Start Time: {booked[2]}")
+        st.text(f"End Time: {booked[3]}")
+        st.text(f"Booking Info: {booked[4]}")
 
-# Generate time slots
-timeslots = [(datetime(2023, 1, 1, 7, 0) + timedelta(minutes=30*i)).strftime('%H:%M') for i in range(25)]
+    # Display all bookings in a table with delete option
+    st.write("\n\n## All Bookings for the Day")
+    if bookings_for_the_day:
+        for index, (room, booking_date, start_time, end_time, info) in enumerate(bookings_for_the_day):
+            row = st.columns((1, 1, 1, 1, 1, 0.2))
+            row[0].write(room)
+            row[1].write(booking_date)
+            row[2].write(start_time)
+            row[3].write(end_time)
+            row[4].write(info)
+            # Deleting in a callback runs before the fragment reruns, so only the grid is redrawn
+            row[5].button('🗑️', key=f"delete_{index}", on_click=on_delete_booking, args=(room, booking_date, start_time))
+    else:
+        st.write("No bookings for the selected date.")
 
-losen = st.text_input('Ange lösenord:', )
-if losen == st.secrets["losen"]:
+# Compare password hashes in constant time; falls back to hashing the plain "losen" secret
+def check_losen(losen):
+    if "losen_hash" in st.secrets:
+        expected = st.secrets["losen_hash"]
+    else:
+        expected = hashlib.sha256(st.secrets["losen"].encode()).hexdigest()
+    return hmac.compare_digest(hashlib.sha256(losen.encode()).hexdigest(), expected)
+
+# Only check the password on an explicit login, then remember it for the session
+if not st.session_state.get("auth"):
+    losen = st.text_input('Ange lösenord:', )
+    if st.button("Login"):
+        if check_losen(losen):
+            st.session_state["auth"] = True
+            st.rerun()
+        else:
+            st.warning("Fel lösenord!")
+
+if st.session_state.get("auth"):
 
     # Static Sidebar for Booking Form
     with st.sidebar:
         st.write("Booking Form")
-        room_selection = st.selectbox("Select Room", rooms)
-        timeslot_selection = st.selectbox("Select Timeslot", timeslots)
-        end_timeslots = timeslots[timeslots.index(timeslot_selection)+1:]
+        room_selection = st.selectbox("Select Room", ROOMS)
+        timeslot_selection = st.selectbox("Select Timeslot", TIMESLOTS)
+        end_timeslots = TIMESLOTS[TIMESLOT_IDX[timeslot_selection]+1:]
         end_time_selection = st.selectbox("End Time", end_timeslots)
         booking_info = st.text_area("Your name and Booking Info")
         
@@ -126,37 +403,24 @@ if losen == st.secrets["losen"]:
         if st.button("Confirm Booking"):
             if not booking_info:  # Check if booking info is empty
                 st.warning("Booking info is mandatory!")
+            elif end_time_selection is None:  # No end time is offered for the last timeslot
+                st.sidebar.warning("Please select an end time. No bookings made!")
             else:
-                # Check availability
-                all_dates_available = True
-                current_date = st.session_state.selected_date
-                for _ in range(recurring_weeks if recurring_booking else 1):
-                    if not is_room_available(room_selection, str(current_date), timeslot_selection, end_time_selection):
-                        all_dates_available = False
-                        break
-                    current_date += timedelta(days=7)  # move to next week only if recurring booking
-
-                # Display warning if not all dates are available
-                if not all_dates_available:
-                    st.sidebar.warning(f"Room is not available for all selected dates. No bookings made!")
-                    time.sleep(2)
-                    st.experimental_rerun()
-
-                # Booking logic
+                # Booking logic; availability for every week is checked inside the same transaction.
+                # The grid is rendered further down in this same run, so no rerun is needed
                 try:
-                    current_date = st.session_state.selected_date
-                    for _ in range(recurring_weeks if recurring_booking else 1):
-                        with sqlite3.connect("bookings.db") as conn:
-                            conn.execute("INSERT INTO bookings (room_name, date, start_time, end_time, booking_info) VALUES (?, ?, ?, ?, ?)",
-                                        (room_selection, str(current_date), timeslot_selection, end_time_selection, booking_info))
-                        current_date += timedelta(days=7)
-                    
-                    if recurring_booking:
-                        st.sidebar.success(f"Recurring bookings confirmed for the next {recurring_weeks} weeks!")
+                    start_date = st.session_state.selected_date
+                    booking_dates = [str(start_date + timedelta(days=7*i)) for i in range(recurring_weeks if recurring_booking else 1)]
+
+                    # Display warning if not all dates are available
+                    if not add_bookings(room_selection, booking_dates, timeslot_selection, end_time_selection, booking_info):
+                        st.sidebar.warning(f"Room is not available for all selected dates. No bookings made!")
                     else:
-                        st.sidebar.success("Booking Confirmed!")
-                    upload_db_to_gcs(credentials, GCS_BUCKET, DB_NAME, DB_BKP_NAME)
-                    st.experimental_rerun()
+                        if recurring_booking:
+                            st.sidebar.success(f"Recurring bookings confirmed for the next {recurring_weeks} weeks!")
+                        else:
+                            st.sidebar.success("Booking Confirmed!")
+                        schedule_db_upload()
                 except Exception as e:
                     st.sidebar.error(f"Error: {e}")
 
@@ -180,48 +444,11 @@ if losen == st.secrets["losen"]:
     # Create a grid layout for rooms vs time slots
     st.write("\n")  # Adds a bit of space
 
-    # Display room names as headers
-    header_columns = st.columns(len(rooms) + 1)  # +1 for the timeslot header
-    header_columns[0].write("Time Slot")
-    for idx, room in enumerate(rooms):
-        header_columns[idx + 1].write(room)
-
-    for timeslot in timeslots:
-        columns = st.columns(len(rooms) + 1)
-        columns[0].write(timeslot)  # Display the timeslot
-        for idx, room in enumerate(rooms):
-            with columns[idx + 1]:
-                booked = is_room_booked(room, str(st.session_state.selected_date), timeslot)
-                if booked:
-                    if st.button(f"Booked", key=f"Info {room} {timeslot}", help=f"{booked[4]}"):
-                        with st.sidebar:
-                            st.write(f"Booking Info for {room} at {timeslot} on {st.session_state.selected_date}")
-                            st.text(f"Start Time: {booked[2]}")
-                            st.text(f"End Time: {booked[3]}")
-                            st.text(f"Booking Info: {booked[4]}")
-
-
-    # Display all bookings in a table with delete option
-    st.write("\n\n## All Bookings for the Day")
-    bookings_for_the_day = get_all_bookings(str(st.session_state.selected_date))
-    if bookings_for_the_day:
-        df = pd.DataFrame(bookings_for_the_day, columns=['Room', 'Date', 'Start Time', 'End Time', 'Booking Info'])
-        for index, booking in df.iterrows():
-            row = st.columns((1, 1, 1, 1, 1, 0.2))
-            row[0].write(booking['Room'])
-            row[1].write(booking['Date'])
-            row[2].write(booking['Start Time'])
-            row[3].write(booking['End Time'])
-            row[4].write(booking['Booking Info'])
-            if row[5].button('🗑️', key=f"delete_{index}"):
-                delete_booking(booking['Room'], booking['Date'], booking['Start Time'])
-                st.success("Booking Deleted!")
-                upload_db_to_gcs(credentials, GCS_BUCKET, DB_NAME, DB_BKP_NAME)
-                st.experimental_rerun()
-    else:
-        st.write("No bookings for the selected date.")
+    render_grid(str(st.session_state.selected_date))
 
     if st.button("Restore Database"):
-        download_db_from_gcs(credentials, GCS_BUCKET, DB_BKP_NAME, DB_NAME)
+        with close_conn():
+            download_db_from_gcs(DB_BKP_NAME, DB_NAME)
+            init_db()  # _init_once has already run, so index the downloaded file here
         st.success("Database downloaded successfully!")
-        st.experimental_rerun()
+        st.rerun()